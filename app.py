@@ -6,16 +6,17 @@ stock ticker symbol.  After submitting, the app will process each prompt and
 display the results.
 """
 
-import json
-from collections import Counter
+import asyncio
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
 from flask import Flask, render_template, request
 
 from models import database
-from models.prompt_loader import load_prompts, Prompt
-from models.ai_client import AIClient
+from models.aggregate import aggregate, empty_buffers, rating_code
+from models.prompt_loader import load_prompts_cached, Prompt
+from models.ai_client import AIClient, json_dumps
 
 
 app = Flask(__name__)
@@ -26,6 +27,10 @@ database.init_db()
 # Instantiate AI client once
 ai_client = AIClient()
 
+# Prompt definitions are parsed once and reloaded only when files change
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+load_prompts_cached(PROMPTS_DIR)
+
 
 def load_context(ticker: str) -> Dict[str, Any]:
     """Load or construct the analysis context for a ticker.
@@ -33,7 +38,8 @@ def load_context(ticker: str) -> Dict[str, Any]:
     This function currently returns a simple context containing only the ticker
     symbol.  Extend this function to pull in historical price data,
     fundamentals, news, etc.  The context object will be passed to your
-    prompts as the `context` variable.
+    prompts as the `context` variable, and its JSON serialisation as
+    `context_json`.
     """
     return {"ticker": ticker}
 
@@ -46,44 +52,49 @@ def run_analysis(ticker: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     metrics (average score, final rating, final target price).
     """
     context = load_context(ticker)
-    context_json = json.dumps(context)
+    # Serialised once per run (sorted, so it doubles as the cache key material)
+    context_json = json_dumps(context, sort_keys=True)
 
-    # Load prompt definitions from the prompts directory
-    prompts_dir = Path(__file__).resolve().parent / "prompts"
-    prompts: List[Prompt] = load_prompts(prompts_dir)
+    # Load prompt definitions (cached until a file in the directory changes)
+    prompts: List[Prompt] = load_prompts_cached(PROMPTS_DIR)
     if not prompts:
         raise RuntimeError("No prompt definitions found in the prompts directory.")
 
-    # Start run in database
-    run_id = database.start_run(ticker, context_json)
+    # Start run in database; one timestamp is shared by the run and its rows
+    now = time.time()
+    run_id = database.start_run(ticker, context_json, now)
 
     result_entries: List[Dict[str, Any]] = []
-    scores: List[int] = []
-    ratings: List[str] = []
-    targets: List[float] = []
+    pending_rows: List[Tuple[Any, ...]] = []
+    # Pre-sized buffers for the summary metrics, one slot per prompt
+    scores, targets, ratings = empty_buffers(len(prompts))
+
+    # Fan out all prompts concurrently; results come back in prompt order
+    generated = asyncio.run(ai_client.agenerate_all(prompts, context, context_json))
 
-    for prompt in prompts:
-        parsed_data, raw_text = ai_client.generate(prompt, context)
+    for i, (prompt, (parsed_data, raw_text)) in enumerate(zip(prompts, generated)):
         score = int(parsed_data.get("score", 0))
         rating = str(parsed_data.get("rating", "")).upper()
         target_price = float(parsed_data.get("target_buy_price", 0))
         rationale = parsed_data.get("rationale", "")
-        # Save individual prompt result
-        database.save_prompt_result(
-            run_id,
-            prompt.prompt_id,
-            prompt.version,
-            prompt.name,
-            score,
-            rating,
-            target_price,
-            rationale,
-            raw_text,
+        # Queue individual prompt result; all rows are written in one batch
+        pending_rows.append(
+            (
+                run_id,
+                prompt.prompt_id,
+                prompt.version,
+                prompt.name,
+                score,
+                rating,
+                target_price,
+                rationale,
+                raw_text,
+            )
         )
         # Collect for summary
-        scores.append(score)
-        ratings.append(rating)
-        targets.append(target_price)
+        scores[i] = score
+        targets[i] = target_price
+        ratings[i] = rating_code(rating)
         # Prepare entry for display
         result_entries.append(
             {
@@ -97,20 +108,11 @@ def run_analysis(ticker: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
             }
         )
 
-    # Compute aggregated metrics
-    average_score = sum(scores) / len(scores)
-    # Determine final rating based on majority vote; if tie, choose HOLD
-    rating_counts = Counter(ratings)
-    most_common = rating_counts.most_common()
-    if len(most_common) == 1:
-        final_rating = most_common[0][0]
-    else:
-        # If tie for top counts, default to HOLD
-        if len(most_common) >= 2 and most_common[0][1] == most_common[1][1]:
-            final_rating = "HOLD"
-        else:
-            final_rating = most_common[0][0]
-    final_target_price = sum(targets) / len(targets)
+    database.save_prompt_results_bulk(pending_rows, now)
+
+    # Compute aggregated metrics: average score and target price, and the
+    # final rating by majority vote (ties default to HOLD)
+    average_score, final_rating, final_target_price = aggregate(scores, targets, ratings)
 
     # Finish run in database
     database.finish_run(run_id, average_score, final_rating, final_target_price)
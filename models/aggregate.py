@@ -0,0 +1,81 @@
+"""Aggregation of per-prompt results into run-level summary metrics.
+
+`run_analysis` records each prompt's score, target price and rating code into
+buffers from `empty_buffers` and then calls `aggregate`.  When `numba` (and
+therefore `numpy`) is installed the buffers are numpy arrays and the reduction
+runs as a compiled kernel, cached on disk so the JIT cost is paid once.
+Without it the same kernel runs as plain Python over lists.  numba is not
+listed in requirements.txt; install it separately (see the README) to turn
+on the compiled path.
+"""
+
+from typing import Any, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+    from numba import njit  # type: ignore
+except ImportError:
+    np = None  # Optional dependency
+    njit = None
+
+
+RATINGS = ("BUY", "HOLD", "SELL")
+_RATING_CODES = {rating: code for code, rating in enumerate(RATINGS)}
+_HOLD = _RATING_CODES["HOLD"]
+UNKNOWN_RATING = -1
+
+
+def rating_code(rating: str) -> int:
+    """Map a rating string to its integer code (`UNKNOWN_RATING` if invalid)."""
+    return _RATING_CODES.get(rating, UNKNOWN_RATING)
+
+
+def empty_buffers(n: int) -> Tuple[Any, Any, Any]:
+    """Return pre-sized `(scores, targets, ratings)` buffers for `n` prompts.
+
+    Scores are held as float64: replies that fail schema validation still
+    reach the summary, and an out-of-range score must not overflow a fixed
+    width integer buffer.
+    """
+    if np is not None:
+        return np.empty(n, np.float64), np.empty(n, np.float64), np.empty(n, np.int8)
+    return [0] * n, [0.0] * n, [UNKNOWN_RATING] * n
+
+
+def _aggregate_kernel(scores, targets, ratings):
+    n = len(scores)
+    score_sum = 0.0
+    target_sum = 0.0
+    counts = [0, 0, 0]
+    for i in range(n):
+        score_sum += scores[i]
+        target_sum += targets[i]
+        code = ratings[i]
+        if code >= 0:
+            counts[code] += 1
+    # Majority vote; a tie for the top count (including no valid ratings)
+    # resolves to HOLD
+    best = 0
+    for k in range(1, 3):
+        if counts[k] > counts[best]:
+            best = k
+    for k in range(3):
+        if k != best and counts[k] == counts[best]:
+            best = _HOLD
+            break
+    return score_sum / n, best, target_sum / n
+
+
+_aggregate = njit(cache=True)(_aggregate_kernel) if njit is not None else _aggregate_kernel
+
+
+def aggregate(
+    scores: Sequence[float], targets: Sequence[float], ratings: Sequence[int]
+) -> Tuple[float, str, float]:
+    """Reduce per-prompt results to `(average_score, final_rating, final_target_price)`.
+
+    `ratings` holds codes from `rating_code`.  The final rating is the
+    majority vote over valid ratings; ties default to HOLD.
+    """
+    average_score, final_code, final_target_price = _aggregate(scores, targets, ratings)
+    return float(average_score), RATINGS[final_code], float(final_target_price)
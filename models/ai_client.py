@@ -9,22 +9,70 @@ fill in the OpenAI call where indicated.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
 import random
-from typing import Dict, Any, Tuple
+from typing import Annotated, Dict, Any, List, Literal, Optional, Tuple
 
 try:
+    import httpx  # type: ignore  # installed alongside openai>=1.0
     import openai  # type: ignore
 except ImportError:
     openai = None  # Optional dependency
 
-from jsonschema import validate, ValidationError  # type: ignore
-from jinja2 import Template  # type: ignore
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # Optional dependency, faster JSON (de)serialisation
+
+try:
+    import msgspec  # type: ignore
+except ImportError:
+    msgspec = None  # Optional dependency, parses and validates replies in one pass
+
+from jsonschema import ValidationError  # type: ignore
 
+from . import database
 from .prompt_loader import Prompt
 
 
+# Transient API errors (429/5xx, dropped connections) are retried by the
+# OpenAI SDK with jittered exponential backoff, honouring Retry-After.
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 5.0
+
+# `json_dumps` always produces compact UTF-8 JSON, whichever backend is
+# installed, so stored context, template text and cache keys are identical.
+if orjson is not None:
+
+    def json_dumps(obj: Any, sort_keys: bool = False) -> str:
+        """Serialise `obj` to a compact JSON string."""
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+
+    json_loads = orjson.loads
+else:
+
+    def json_dumps(obj: Any, sort_keys: bool = False) -> str:
+        """Serialise `obj` to a compact JSON string."""
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False)
+
+    json_loads = json.loads
+
+
+if msgspec is not None:
+
+    class LLMResult(msgspec.Struct):
+        """Expected shape of a model reply, as requested in `AIClient._messages`."""
+
+        score: Annotated[int, msgspec.Meta(ge=1, le=100)]
+        rating: Literal["BUY", "HOLD", "SELL"]
+        target_buy_price: float
+        rationale: str
+
+
 class AIClient:
     """Language model client.
 
@@ -36,55 +84,132 @@ class AIClient:
 
     def __init__(self) -> None:
         self.api_key = os.getenv("OPENAI_API_KEY")
-        if self.api_key and openai is not None:
-            openai.api_key = self.api_key
         self.llm_available = bool(self.api_key and openai is not None)
+        # One client for the lifetime of the process so that sync calls reuse
+        # pooled keep-alive connections instead of paying a TLS handshake each.
+        self._client = (
+            openai.OpenAI(
+                api_key=self.api_key,
+                max_retries=MAX_RETRIES,
+                timeout=self._timeout(),
+            )
+            if self.llm_available
+            else None
+        )
+
+    @staticmethod
+    def _timeout() -> Any:
+        """Return the per-request timeout used by both OpenAI clients."""
+        return httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
 
-    def _render_template(self, template_str: str, context: Dict[str, Any]) -> str:
-        """Render a prompt template using Jinja2.
+    def _render_template(
+        self, prompt: Prompt, context: Dict[str, Any], context_json: str
+    ) -> str:
+        """Render a prompt's template using Jinja2.
 
         The context is passed under the variable name `context` so that you can
         write `{{ context }}` in your YAML templates.  Jinja2 will convert
-        dictionaries to their string representation; if you prefer JSON, call
-        `json.dumps(context)` in your template.
+        dictionaries to their string representation; if you prefer JSON, use
+        `{{ context_json }}`, which is serialised once per run rather than once
+        per prompt.  The template itself is compiled once when the prompt is
+        loaded.
         """
-        template = Template(template_str)
-        return template.render(context=context)
+        return prompt.compiled_template.render(context=context, context_json=context_json)
+
+    def _cache_key(self, prompt: Prompt, context_json: str) -> str:
+        """Return the response-cache key for a prompt version and context.
+
+        Model calls run at temperature 0, so the same prompt version applied
+        to the same context is expected to give the same answer.
+        `context_json` must be serialised with sorted keys so that equal
+        contexts give equal keys.
+        """
+        material = f"{prompt.prompt_id}|{prompt.version}|{context_json}"
+        return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+    def _cached_response(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Look up a previously stored `(parsed_data, raw_text)` pair."""
+        cached = database.get_cached_response(key)
+        if cached is None:
+            return None
+        raw_text, parsed_json = cached
+        return json_loads(parsed_json), raw_text
+
+    def _messages(self, rendered_prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the model for a rendered prompt."""
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are a helpful financial analyst. When given a prompt, "
+                    "you return a JSON object with the keys: score (1–100), rating "
+                    "(BUY/HOLD/SELL), target_buy_price, and rationale."
+                ),
+            },
+            {"role": "user", "content": rendered_prompt},
+        ]
 
     def _call_openai(self, rendered_prompt: str) -> str:
         """Call the OpenAI API with the rendered prompt.
 
         This method returns the raw response text.  Adjust the model name,
-        temperature and other parameters as needed.  Note that rate limiting
-        and retries are not implemented here.
+        temperature and other parameters as needed.  Retries and timeouts
+        are configured on the client (see `MAX_RETRIES`).
         """
-        assert openai is not None  # for type checkers
-        # Use ChatGPT (GPT‑4) via the ChatCompletion API.  Adjust the model name
+        assert self._client is not None  # for type checkers
+        # Use ChatGPT (GPT‑4) via the Chat Completions API.  Adjust the model name
         # if necessary (e.g. "gpt-4", "gpt-4-turbo", or "gpt-3.5-turbo").
-        response = openai.ChatCompletion.create(
+        response = self._client.chat.completions.create(
             model="gpt-4",  # default to ChatGPT (GPT‑4)
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful financial analyst. When given a prompt, "
-                        "you return a JSON object with the keys: score (1–100), rating "
-                        "(BUY/HOLD/SELL), target_buy_price, and rationale."
-                    ),
-                },
-                {"role": "user", "content": rendered_prompt},
-            ],
+            messages=self._messages(rendered_prompt),
             temperature=0.0,
         )
         # Extract the assistant's reply
         return response.choices[0].message.content.strip()
 
-    def generate(self, prompt: Prompt, context: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    async def _call_openai_async(self, client: Any, rendered_prompt: str) -> str:
+        """Async counterpart of `_call_openai` using an `openai.AsyncOpenAI` client."""
+        response = await client.chat.completions.create(
+            model="gpt-4",
+            messages=self._messages(rendered_prompt),
+            temperature=0.0,
+        )
+        return response.choices[0].message.content.strip()
+
+    def _prepare(
+        self,
+        prompt: Prompt,
+        context: Dict[str, Any],
+        context_json: Optional[str],
+    ) -> Tuple[Optional[Tuple[Dict[str, Any], str]], str, Optional[str]]:
+        """Shared front half of `generate` and `agenerate`.
+
+        Returns `(cached, cache_key, rendered)`.  On a cache hit `cached` is
+        the stored `(parsed_data, raw_text)` pair and nothing is rendered;
+        otherwise `rendered` is the prompt text to send to the model.
+        """
+        if context_json is None:
+            context_json = json_dumps(context, sort_keys=True)
+        cache_key = self._cache_key(prompt, context_json)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached, cache_key, None
+        return None, cache_key, self._render_template(prompt, context, context_json)
+
+    def generate(
+        self,
+        prompt: Prompt,
+        context: Dict[str, Any],
+        context_json: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], str]:
         """Generate a result for a given prompt and context.
 
         Args:
             prompt: The Prompt object containing template and schema.
             context: A dictionary with the runtime context (e.g. stock data).
+            context_json: Pre-serialised JSON form of `context` with sorted
+                keys (as produced by `json_dumps(context, sort_keys=True)`);
+                computed here when omitted.
 
         Returns:
             A tuple `(parsed_data, raw_text)` where `parsed_data` is a Python
@@ -92,53 +217,164 @@ class AIClient:
             `rationale`, and `raw_text` is the raw string returned by the
             language model (which may be JSON or plain text).
         """
-        rendered = self._render_template(prompt.template, {"context": context})
+        if not self.llm_available:
+            return self._stub_response()
 
-        if self.llm_available:
-            try:
-                raw_text = self._call_openai(rendered)
-            except Exception as exc:
-                # Fallback to stub if API call fails
-                raw_text = None
-        else:
+        cached, cache_key, rendered = self._prepare(prompt, context, context_json)
+        if cached is not None:
+            return cached
+
+        try:
+            raw_text = self._call_openai(rendered)
+        except Exception:
+            # Fallback to stub if API call fails
+            raw_text = None
+
+        return self._real_response(prompt, raw_text, cache_key)
+
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        context: Dict[str, Any],
+        context_json: Optional[str] = None,
+        *,
+        client: Optional[Any] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Async variant of `generate`, taking the same positional arguments.
+
+        `client` (keyword-only) is the `openai.AsyncOpenAI` instance to issue
+        the request with; when it is omitted a client is opened for this call
+        only.  The stub response is returned only when no API key is
+        configured.
+        """
+        if not self.llm_available:
+            return self._stub_response()
+        if client is None:
+            async with self._async_client(pool_size=2) as client:
+                return await self.agenerate(prompt, context, context_json, client=client)
+
+        cached, cache_key, rendered = self._prepare(prompt, context, context_json)
+        if cached is not None:
+            return cached
+
+        try:
+            raw_text = await self._call_openai_async(client, rendered)
+        except Exception:
+            # Fallback to stub if API call fails
             raw_text = None
 
-        parsed: Dict[str, Any]
-        if raw_text:
+        return self._real_response(prompt, raw_text, cache_key)
+
+    async def agenerate_all(
+        self,
+        prompts: List[Prompt],
+        context: Dict[str, Any],
+        context_json: Optional[str] = None,
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """Run every prompt against the context concurrently.
+
+        Results are returned in the same order as `prompts`.  A single async
+        client (and connection pool) is shared by every request in the
+        fan-out; it is scoped to this call because the pool is bound to the
+        running event loop.
+        """
+        if not self.llm_available:
+            return [self._stub_response() for _ in prompts]
+        if context_json is None:
+            context_json = json_dumps(context, sort_keys=True)
+        # Size the pool to the fan-out (with headroom for retries) so no prompt
+        # waits for a free connection
+        async with self._async_client(pool_size=len(prompts) * 2) as client:
+            tasks = [self.agenerate(p, context, context_json, client=client) for p in prompts]
+            return list(await asyncio.gather(*tasks))
+
+    def _async_client(self, pool_size: int) -> Any:
+        """Create an `openai.AsyncOpenAI` client with a pool of `pool_size`.
+
+        Use it as an async context manager within a single event loop; its
+        connection pool cannot be reused once that loop has closed.
+        """
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        http_client = httpx.AsyncClient(limits=limits, timeout=self._timeout())
+        return openai.AsyncOpenAI(
+            api_key=self.api_key,
+            max_retries=MAX_RETRIES,
+            timeout=self._timeout(),
+            http_client=http_client,
+        )
+
+    def _stub_response(self) -> Tuple[Dict[str, Any], str]:
+        """Return a random placeholder result and its JSON text."""
+        randint = random.randint
+        uniform = random.uniform
+        score = randint(1, 100)
+        rating = (
+            "BUY" if score >= 70 else "HOLD" if score >= 40 else "SELL"
+        )
+        target_price = round(uniform(10.0, 200.0), 2)
+        rationale = (
+            "This is a placeholder response. Replace AIClient.generate with a real model call."
+        )
+        parsed = {
+            "score": score,
+            "rating": rating,
+            "target_buy_price": target_price,
+            "rationale": rationale,
+        }
+        return parsed, json_dumps(parsed)
+
+    def _real_response(
+        self,
+        prompt: Prompt,
+        raw_text: Optional[str],
+        cache_key: str,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Parse and validate model output, falling back to a stub.
+
+        When msgspec is installed, a reply of the expected shape is decoded
+        and validated against `LLMResult` in a single pass.  Anything else
+        goes through the lenient path: plain JSON parsing followed by the
+        prompt's JSON Schema, which only warns on mismatch.
+
+        Only replies that passed validation (msgspec or the prompt's schema)
+        are stored in the response cache under `cache_key`, so a bad reply
+        is retried on the next run.  Stub responses are never cached.
+        """
+        parsed: Dict[str, Any] = {}
+        validated = False
+        if raw_text and msgspec is not None:
+            try:
+                parsed = msgspec.to_builtins(msgspec.json.decode(raw_text, type=LLMResult))
+                validated = True
+            except msgspec.DecodeError:
+                # Malformed or unexpected shape; retry leniently below
+                parsed = {}
+        if raw_text and not validated:
             # Try to parse JSON from the raw text.  If parsing fails,
             # leave parsed as an empty dict and rely on stub.
             try:
-                parsed = json.loads(raw_text)
+                parsed = json_loads(raw_text)
             except json.JSONDecodeError:
                 parsed = {}
-        else:
-            parsed = {}
+            if not isinstance(parsed, dict):
+                parsed = {}
 
-        # If we don't have parsed data, produce a stub.
+        # If we don't have parsed data (API error or unparseable reply),
+        # produce a stub.
         if not parsed:
-            score = random.randint(1, 100)
-            rating = (
-                "BUY" if score >= 70 else "HOLD" if score >= 40 else "SELL"
-            )
-            target_price = round(random.uniform(10.0, 200.0), 2)
-            rationale = (
-                "This is a placeholder response. Replace AIClient.generate with a real model call."
-            )
-            parsed = {
-                "score": score,
-                "rating": rating,
-                "target_buy_price": target_price,
-                "rationale": rationale,
-            }
-            raw_text = json.dumps(parsed)
-
-        # Validate against schema if provided
-        if prompt.schema:
+            return self._stub_response()
+
+        # Validate against schema if provided (and not already validated)
+        if not validated and prompt.validator is not None:
             try:
-                validate(parsed, prompt.schema)
+                prompt.validator.validate(parsed)
+                validated = True
             except ValidationError as exc:
                 # If validation fails, you might choose to handle it here.
                 # For now we simply print a warning and proceed with parsed data.
                 print(f"Warning: validation failed for prompt {prompt.prompt_id}: {exc}")
 
+        if validated:
+            database.save_cached_response(cache_key, raw_text, json_dumps(parsed))
+
         return parsed, raw_text
@@ -7,11 +7,13 @@ the connection and table creation code accordingly.
 
 import os
 import sqlite3
+import threading
+import time
 import uuid
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "results.db"
@@ -20,19 +22,71 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
 def _connect() -> sqlite3.Connection:
-    """Return a new connection to the SQLite database.
+    """Open the shared connection to the SQLite database.
 
-    The connection uses row factory to return dictionary-like rows.
+    The connection uses row factory to return dictionary-like rows.  It runs
+    in autocommit mode (transactions are opened explicitly by
+    `get_connection`) with WAL journaling so readers never block the writer.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
 
+# A single long-lived connection shared by all requests.  Flask may serve
+# requests from several threads, so access is serialised with a lock.
+_CONN = _connect()
+_LOCK = threading.Lock()
+
+
+def _timestamp(now: Optional[float] = None) -> str:
+    """Format a Unix timestamp (default: the current time) as UTC ISO 8601."""
+    if now is None:
+        now = time.time()
+    return datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+
+
+# State for the fallback UUIDv7 generator: last millisecond issued and the
+# 12-bit counter stored in the `rand_a` field within that millisecond.
+_RUN_ID_LOCK = threading.Lock()
+_last_run_id_ms = 0
+_run_id_counter = 0
+
+
+def _new_run_id() -> str:
+    """Return a new time-ordered UUID (version 7) as a string.
+
+    Consecutive runs get increasing ids, which keeps inserts into the
+    `runs` primary-key index append-only instead of scattered.
+    """
+    global _last_run_id_ms, _run_id_counter
+    if hasattr(uuid, "uuid7"):
+        return str(uuid.uuid7())
+    with _RUN_ID_LOCK:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_run_id_ms:
+            # New millisecond: seed the counter randomly, leaving headroom
+            _run_id_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Same (or earlier, if the clock stepped back) millisecond
+            ms = _last_run_id_ms
+            _run_id_counter += 1
+            if _run_id_counter > 0xFFF:
+                ms += 1
+                _run_id_counter = 0
+        _last_run_id_ms = ms
+        counter = _run_id_counter
+    # 48-bit ms timestamp | version 7 | 12-bit counter | variant | 62 random bits
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = ms << 80 | 0x7 << 76 | counter << 64 | 0x2 << 62 | rand_b
+    return str(uuid.UUID(int=value))
+
 
 def init_db() -> None:
     """Initialize the database tables if they don't exist."""
-    with _connect() as conn:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -66,32 +120,62 @@ def init_db() -> None:
             );
             """
         )
-        conn.commit()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                raw_text TEXT NOT NULL,
+                parsed_json TEXT NOT NULL,
+                created_at TEXT
+            );
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_prompt_results_run_id "
+            "ON prompt_results(run_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_runs_ticker_started "
+            "ON runs(ticker, started_at DESC)"
+        )
 
 
 @contextmanager
 def get_connection():
-    """Provide a context manager for database connections."""
-    conn = _connect()
-    try:
-        yield conn
-        conn.commit()
-    finally:
-        conn.close()
+    """Provide the shared connection inside a single transaction.
+
+    The transaction is committed when the block exits normally and rolled
+    back if the block or the commit itself raises.  The connection itself
+    stays open, so it must never be left inside a transaction: every later
+    `BEGIN` would fail until the process restarts.
+    """
+    with _LOCK:
+        if _CONN.in_transaction:
+            # Defensive: a transaction left open by an earlier failure
+            _CONN.execute("ROLLBACK")
+        try:
+            _CONN.execute("BEGIN")
+            yield _CONN
+            _CONN.execute("COMMIT")
+        except BaseException:
+            if _CONN.in_transaction:
+                _CONN.execute("ROLLBACK")
+            raise
 
 
-def start_run(ticker: str, context_json: str) -> str:
+def start_run(ticker: str, context_json: str, now: Optional[float] = None) -> str:
     """Insert a new run and return its UUID.
 
     Args:
         ticker: The stock symbol being analysed.
         context_json: JSON representation of the context passed to prompts.
+        now: Unix timestamp to record as the start time (default: now).
 
     Returns:
-        The generated run_id (a UUID string).
+        The generated run_id (a time-ordered UUID string).
     """
-    run_id = str(uuid.uuid4())
-    started_at = datetime.utcnow().isoformat()
+    run_id = _new_run_id()
+    started_at = _timestamp(now)
     with get_connection() as conn:
         conn.execute(
             """
@@ -110,7 +194,7 @@ def finish_run(
     final_target_price: float,
 ) -> None:
     """Update a run row when analysis completes."""
-    finished_at = datetime.utcnow().isoformat()
+    finished_at = _timestamp()
     with get_connection() as conn:
         conn.execute(
             """
@@ -134,7 +218,7 @@ def save_prompt_result(
     raw_response: str,
 ) -> None:
     """Insert a row into `prompt_results` for a single prompt invocation."""
-    created_at = datetime.utcnow().isoformat()
+    created_at = _timestamp()
     with get_connection() as conn:
         conn.execute(
             """
@@ -158,6 +242,29 @@ def save_prompt_result(
         )
 
 
+def save_prompt_results_bulk(
+    rows: Iterable[Tuple[Any, ...]], now: Optional[float] = None
+) -> None:
+    """Insert several `prompt_results` rows in a single transaction.
+
+    Each row is a tuple `(run_id, prompt_id, prompt_version, prompt_name,
+    score, rating, target_buy_price, rationale, raw_response)`, i.e. the
+    arguments of `save_prompt_result`.  All rows share one `created_at`
+    timestamp, taken from `now` (a Unix timestamp) when given.
+    """
+    created_at = _timestamp(now)
+    with get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO prompt_results (
+                run_id, prompt_id, prompt_version, prompt_name,
+                score, rating, target_buy_price, rationale, raw_response, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(*row, created_at) for row in rows],
+        )
+
+
 def get_prompt_results(run_id: str):
     """Return all prompt results for a given run_id."""
     with get_connection() as conn:
@@ -166,3 +273,28 @@ def get_prompt_results(run_id: str):
             (run_id,),
         )
         return [dict(row) for row in cur.fetchall()]
+
+
+def get_cached_response(key: str) -> Optional[Tuple[str, str]]:
+    """Return `(raw_text, parsed_json)` for a cached model response, if any."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT raw_text, parsed_json FROM response_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+    if row is None:
+        return None
+    return row["raw_text"], row["parsed_json"]
+
+
+def save_cached_response(key: str, raw_text: str, parsed_json: str) -> None:
+    """Store (or replace) a model response in `response_cache`."""
+    created_at = _timestamp()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO response_cache (key, raw_text, parsed_json, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (key, raw_text, parsed_json, created_at),
+        )
@@ -1,19 +1,29 @@
 """Utilities for loading prompt definitions from YAML files."""
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 import yaml
+from jinja2 import Template  # type: ignore
+from jsonschema.validators import validator_for  # type: ignore
 
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml bindings
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Prompt:
     prompt_id: str
     name: str
     version: int
     template: str
-    schema: Optional[Dict[str, Any]]
+    schema: Optional[Dict[str, Any]] = field(compare=False)
+    compiled_template: Template = field(repr=False, compare=False)
+    validator: Optional[Any] = field(repr=False, compare=False)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Prompt":
@@ -21,18 +31,28 @@ class Prompt:
 
         Expects keys: `prompt_id`, `name`, `version`, `template`.  The `schema`
         key is optional and can be any JSON‑serialisable structure (usually a
-        JSON Schema).
+        JSON Schema).  When a schema is present it is checked against its
+        meta-schema once and a reusable validator is built for it.
         """
         required = ["prompt_id", "name", "version", "template"]
         for key in required:
             if key not in data:
                 raise ValueError(f"Missing required key '{key}' in prompt definition")
+        template = str(data["template"])
+        schema = data.get("schema")
+        validator = None
+        if schema:
+            validator_cls = validator_for(schema)
+            validator_cls.check_schema(schema)
+            validator = validator_cls(schema)
         return cls(
             prompt_id=str(data["prompt_id"]),
             name=str(data["name"]),
             version=int(data["version"]),
-            template=str(data["template"]),
-            schema=data.get("schema"),
+            template=template,
+            schema=schema,
+            compiled_template=Template(template),
+            validator=validator,
         )
 
 
@@ -46,19 +66,37 @@ def load_prompts(directory: Path) -> List[Prompt]:
         A list of Prompt objects sorted by filename.  Files that fail to parse
         or validate are skipped with an exception printed to the console.
     """
+    return _load_prompts(directory, [])
+
+
+def _load_prompts(
+    directory: Path, template_files: List[Tuple[str, int, int]]
+) -> List[Prompt]:
+    """Implementation of `load_prompts`.
+
+    For every `template_file` that is referenced, its resolved path, mtime
+    and size (taken before it is read) are appended to `template_files`, so
+    callers can watch those files for changes too.
+    """
     prompts: List[Prompt] = []
     if not directory.exists():
         return prompts
-    for file in sorted(directory.glob("*.yml")) + sorted(directory.glob("*.yaml")):
+    # Single directory pass; is_file() uses the cached d_type, so no extra stat
+    with os.scandir(directory) as it:
+        entries = [e for e in it if e.is_file() and e.name.endswith((".yml", ".yaml"))]
+    entries.sort(key=lambda e: e.name)
+    for entry in entries:
+        file = Path(entry.path)
         try:
             with file.open("r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_SafeLoader)
             if not isinstance(data, dict):
                 raise ValueError(f"YAML file {file.name} must contain a mapping at top level")
             # If a template_file is specified, read its contents relative to directory
             template_file = data.get("template_file")
             if template_file:
                 template_path = directory / template_file
+                template_files.extend(_files_signature((str(template_path.resolve()),)))
                 if not template_path.exists():
                     raise FileNotFoundError(
                         f"Template file '{template_file}' referenced in {file.name} does not exist"
@@ -70,3 +108,65 @@ def load_prompts(directory: Path) -> List[Prompt]:
         except Exception as exc:
             print(f"Error loading prompt from {file}: {exc}")
     return prompts
+
+
+_Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def _directory_signature(directory_str: str) -> _Signature:
+    """Return `(name, mtime_ns, size)` for every file in a directory."""
+    try:
+        entries = os.scandir(directory_str)
+    except FileNotFoundError:
+        return ()
+    with entries:
+        signature = []
+        for entry in entries:
+            if entry.is_file():
+                st = entry.stat()
+                signature.append((entry.name, st.st_mtime_ns, st.st_size))
+    return tuple(sorted(signature))
+
+
+def _files_signature(paths: Tuple[str, ...]) -> _Signature:
+    """Return `(path, mtime_ns, size)` for each path; missing files get `(0, -1)`."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append((path, 0, -1))
+        else:
+            signature.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+# directory -> (directory signature, template-file signature, prompts)
+_PROMPT_CACHE: Dict[str, Tuple[_Signature, _Signature, Tuple[Prompt, ...]]] = {}
+
+
+def load_prompts_cached(directory: Path) -> List[Prompt]:
+    """Cached variant of `load_prompts`.
+
+    Prompts are parsed (and their templates compiled) once and reused until
+    a file changes, which is detected by comparing modification times and
+    sizes.  Both the files directly in `directory` and every `template_file`
+    the prompts reference (including ones in subdirectories or elsewhere)
+    are watched.
+    """
+    directory_str = str(directory)
+    dir_signature = _directory_signature(directory_str)
+    cached = _PROMPT_CACHE.get(directory_str)
+    if cached is not None:
+        cached_dir_signature, template_signature, prompts = cached
+        template_paths = tuple(path for path, _, _ in template_signature)
+        if (
+            cached_dir_signature == dir_signature
+            and _files_signature(template_paths) == template_signature
+        ):
+            return list(prompts)
+
+    template_files: List[Tuple[str, int, int]] = []
+    prompts = tuple(_load_prompts(directory, template_files))
+    _PROMPT_CACHE[directory_str] = (dir_signature, tuple(template_files), prompts)
+    return list(prompts)
@@ -0,0 +1,12 @@
+"""WSGI entry point for running the app under a production server.
+
+Example:
+
+    gunicorn -k gthread -w 4 --threads 8 --timeout 120 wsgi:app
+
+Each request spends most of its time waiting on the language model, so
+threaded workers let one process serve many analyses at once.  Every
+request thread runs its own event loop for the per-prompt fan-out.
+"""
+
+from app import app  # noqa: F401